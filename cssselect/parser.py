@@ -12,11 +12,11 @@
 
 """
 
-import operator
 import re
 import sys
 import typing
-from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 
 def ascii_lower(string: str) -> str:
@@ -67,6 +67,8 @@ class Selector:
 
     """
 
+    __slots__ = ("parsed_tree", "pseudo_element", "_specificity")
+
     def __init__(
         self, tree: Tree, pseudo_element: Optional[PseudoElement] = None
     ) -> None:
@@ -96,6 +98,7 @@ class Selector:
         #:
         #: .. _Lists3: http://www.w3.org/TR/2011/WD-css3-lists-20110524/#marker-pseudoelement
         self.pseudo_element = pseudo_element
+        self._specificity: Optional[Tuple[int, int, int]] = None
 
     def __repr__(self) -> str:
         if isinstance(self.pseudo_element, FunctionalPseudoElement):
@@ -125,10 +128,12 @@ class Selector:
         .. _specificity: http://www.w3.org/TR/selectors/#specificity
 
         """
-        a, b, c = self.parsed_tree.specificity()
-        if self.pseudo_element:
-            c += 1
-        return a, b, c
+        if self._specificity is None:
+            a, b, c = self.parsed_tree.specificity()
+            if self.pseudo_element:
+                c += 1
+            self._specificity = a, b, c
+        return self._specificity
 
 
 class Class:
@@ -136,6 +141,8 @@ class Class:
     Represents selector.class_name
     """
 
+    __slots__ = ("selector", "class_name")
+
     def __init__(self, selector: Tree, class_name: str) -> None:
         self.selector = selector
         self.class_name = class_name
@@ -170,6 +177,8 @@ class FunctionalPseudoElement:
 
     """
 
+    __slots__ = ("name", "arguments")
+
     def __init__(self, name: str, arguments: Sequence["Token"]):
         self.name = ascii_lower(name)
         self.arguments = arguments
@@ -194,6 +203,8 @@ class Function:
     Represents selector:name(expr)
     """
 
+    __slots__ = ("selector", "name", "arguments")
+
     def __init__(self, selector: Tree, name: str, arguments: Sequence["Token"]) -> None:
         self.selector = selector
         self.name = ascii_lower(name)
@@ -225,6 +236,8 @@ class Pseudo:
     Represents selector:ident
     """
 
+    __slots__ = ("selector", "ident")
+
     def __init__(self, selector: Tree, ident: str) -> None:
         self.selector = selector
         self.ident = ascii_lower(ident)
@@ -246,6 +259,8 @@ class Negation:
     Represents selector:not(subselector)
     """
 
+    __slots__ = ("selector", "subselector")
+
     def __init__(self, selector: Tree, subselector: Tree) -> None:
         self.selector = selector
         self.subselector = subselector
@@ -274,6 +289,8 @@ class Relation:
     Represents selector:has(subselector)
     """
 
+    __slots__ = ("selector", "combinator", "subselector")
+
     def __init__(self, selector: Tree, combinator: "Token", subselector: Selector):
         self.selector = selector
         self.combinator = combinator
@@ -309,6 +326,8 @@ class Matching:
     Represents selector:is(selector_list)
     """
 
+    __slots__ = ("selector", "selector_list")
+
     def __init__(self, selector: Tree, selector_list: Iterable[Tree]):
         self.selector = selector
         self.selector_list = selector_list
@@ -340,6 +359,8 @@ class SpecificityAdjustment:
     Same as selector:is(selector_list), but its specificity is always 0
     """
 
+    __slots__ = ("selector", "selector_list")
+
     def __init__(self, selector: Tree, selector_list: List[Tree]):
         self.selector = selector
         self.selector_list = selector_list
@@ -370,6 +391,8 @@ class Attrib:
     Represents selector[namespace|attrib operator value]
     """
 
+    __slots__ = ("selector", "namespace", "attrib", "operator", "value")
+
     @typing.overload
     def __init__(
         self,
@@ -451,6 +474,8 @@ class Element:
 
     """
 
+    __slots__ = ("namespace", "element")
+
     def __init__(
         self, namespace: Optional[str] = None, element: Optional[str] = None
     ) -> None:
@@ -478,6 +503,8 @@ class Hash:
     Represents selector#id
     """
 
+    __slots__ = ("selector", "id")
+
     def __init__(self, selector: Tree, id: str) -> None:
         self.selector = selector
         self.id = id
@@ -495,6 +522,8 @@ class Hash:
 
 
 class CombinedSelector:
+    __slots__ = ("selector", "combinator", "subselector")
+
     def __init__(self, selector: Tree, combinator: str, subselector: Tree) -> None:
         assert selector is not None
         self.selector = selector
@@ -527,16 +556,23 @@ class CombinedSelector:
 
 #### Parser
 
-# foo
-_el_re = re.compile(r"^[ \t\r\n\f]*([a-zA-Z]+)[ \t\r\n\f]*$")
+# Deletes every character that can appear in a fast path selector:
+# a selector that is not empty once translated cannot match any of them.
+_fast_path_chars = str.maketrans(
+    "",
+    "",
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-#. \t\r\n\f",
+)
+
+# The ID and class fast path regexes are used with fullmatch(), so they need
+# no anchors. Their character classes never overlap with what follows them,
+# which keeps backtracking on a miss to a minimum.
 
 # foo#bar or #bar
-_id_re = re.compile(r"^[ \t\r\n\f]*([a-zA-Z]*)#([a-zA-Z0-9_-]+)[ \t\r\n\f]*$")
+_id_re = re.compile(r"[ \t\r\n\f]*([a-zA-Z]*)#([a-zA-Z0-9_-]+)[ \t\r\n\f]*")
 
 # foo.bar or .bar
-_class_re = re.compile(
-    r"^[ \t\r\n\f]*([a-zA-Z]*)\.([a-zA-Z][a-zA-Z0-9_-]*)[ \t\r\n\f]*$"
-)
+_class_re = re.compile(r"[ \t\r\n\f]*([a-zA-Z]*)\.([a-zA-Z][a-zA-Z0-9_-]*)[ \t\r\n\f]*")
 
 
 def parse(css: str) -> List[Selector]:
@@ -545,6 +581,10 @@ def parse(css: str) -> List[Selector]:
     If you don't care about pseudo-elements or selector specificity,
     you can skip this and use :meth:`~GenericTranslator.css_to_xpath`.
 
+    Results are cached: the returned list is new on each call, but the
+    :class:`Selector` objects in it are shared with later calls for the
+    same string and must be treated as read-only.
+
     :param css:
         A *group of selectors* as a string.
     :raises:
@@ -554,31 +594,62 @@ def parse(css: str) -> List[Selector]:
         selector in the comma-separated group.
 
     """
-    # Fast path for simple cases
-    match = _el_re.match(css)
-    if match:
-        return [Selector(Element(element=match.group(1)))]
-    match = _id_re.match(css)
-    if match is not None:
-        return [Selector(Hash(Element(element=match.group(1) or None), match.group(2)))]
-    match = _class_re.match(css)
-    if match is not None:
-        return [
-            Selector(Class(Element(element=match.group(1) or None), match.group(2)))
-        ]
+    return list(_parse_cached(css))
+
+
+@lru_cache(maxsize=512)
+def _parse_cached(css: str) -> Tuple[Selector, ...]:
+    # Invalid selectors raise and are therefore never cached.
+    return tuple(_parse_uncached(css))
+
+
+def _parse_uncached(css: str) -> List[Selector]:
+    # Fast path for simple cases.
+    # (str.translate() also raises TypeError for non-string input.)
+    if not str.translate(css, _fast_path_chars):
+        has_hash = "#" in css
+        has_dot = "." in css
+        if not has_hash and not has_dot:
+            # Only ASCII letters, digits, "_", "-" and whitespace are left,
+            # so this matches a plain type selector such as "div" or "h1".
+            element = css.strip(" \t\r\n\f")
+            if element.isidentifier():
+                return [Selector(Element(None, element))]
+        elif not has_dot:
+            match = _id_re.fullmatch(css)
+            if match is not None:
+                return [
+                    Selector(
+                        Hash(Element(None, match.group(1) or None), match.group(2))
+                    )
+                ]
+        elif not has_hash:
+            match = _class_re.fullmatch(css)
+            if match is not None:
+                return [
+                    Selector(
+                        Class(Element(None, match.group(1) or None), match.group(2))
+                    )
+                ]
 
-    stream = TokenStream(tokenize(css))
-    stream.source = css
+    stream = TokenStream(tokenize(css), css)
     return list(parse_selector_group(stream))
 
 
-#    except SelectorSyntaxError:
-#        e = sys.exc_info()[1]
-#        message = "%s at %s -> %r" % (
-#            e, stream.used, stream.peek())
-#        e.msg = message
-#        e.args = tuple([message])
-#        raise
+# Token (type, value) pairs and token types checked by the parser, as sets
+# for constant time membership tests.
+_selector_end = frozenset([("EOF", None), ("DELIM", ",")])
+_argument_types = frozenset(["IDENT", "STRING", "NUMBER"])
+_argument_delims = frozenset([("DELIM", "+"), ("DELIM", "-")])
+_relative_combinators = frozenset(
+    [("DELIM", "+"), ("DELIM", "-"), ("DELIM", ">"), ("DELIM", "~")]
+)
+_relative_delims = frozenset([("DELIM", "."), ("DELIM", "*")])
+_pseudo_element_names = frozenset(["first-line", "first-letter", "before", "after"])
+# Delimiters that form an attribute operator when followed by "="
+_attrib_operator_delims: FrozenSet[Tuple[str, Optional[str]]] = frozenset(
+    [("DELIM", c) for c in "^$*~|!"]
+)
 
 
 def parse_selector_group(stream: "TokenStream") -> Iterator[Selector]:
@@ -595,9 +666,8 @@ def parse_selector_group(stream: "TokenStream") -> Iterator[Selector]:
 def parse_selector(stream: "TokenStream") -> Tuple[Tree, Optional[PseudoElement]]:
     result, pseudo_element = parse_simple_selector(stream)
     while 1:
-        stream.skip_whitespace()
-        peek = stream.peek()
-        if peek in (("EOF", None), ("DELIM", ",")):
+        peek = stream.skip_whitespace_and_peek()
+        if peek in _selector_end:
             break
         if pseudo_element:
             raise SelectorSyntaxError(
@@ -619,9 +689,8 @@ def parse_selector(stream: "TokenStream") -> Tuple[Tree, Optional[PseudoElement]
 def parse_simple_selector(
     stream: "TokenStream", inside_negation: bool = False
 ) -> Tuple[Tree, Optional[PseudoElement]]:
-    stream.skip_whitespace()
-    selector_start = len(stream.used)
-    peek = stream.peek()
+    peek = stream.skip_whitespace_and_peek()
+    selector_start = stream.pos
     if peek.type == "IDENT" or peek == ("DELIM", "*"):
         if peek.type == "IDENT":
             namespace = stream.next().value
@@ -673,22 +742,30 @@ def parse_simple_selector(
                     )
                 continue
             ident = stream.next_ident()
-            if ident.lower() in ("first-line", "first-letter", "before", "after"):
+            if ident.lower() in _pseudo_element_names:
                 # Special case: CSS 2.1 pseudo-elements can have a single ':'
                 # Any new pseudo-element must have two.
-                pseudo_element = str(ident)
+                pseudo_element = ident
                 continue
             if stream.peek() != ("DELIM", "("):
                 result = Pseudo(result, ident)
-                if repr(result) == "Pseudo[Element[*]:scope]":
+                if (
+                    result.ident == "scope"
+                    and isinstance(result.selector, Element)
+                    and not result.selector.element
+                    and not result.selector.namespace
+                ):
                     if not (
-                        len(stream.used) == 2
-                        or (len(stream.used) == 3 and stream.used[0].type == "S")
-                        or (len(stream.used) >= 3 and stream.used[-3].is_delim(","))
+                        stream.pos == 2
+                        or (stream.pos == 3 and stream.tokens[0].type == "S")
+                        or (
+                            stream.pos >= 3
+                            and stream.tokens[stream.pos - 3].is_delim(",")
+                        )
                         or (
-                            len(stream.used) >= 4
-                            and stream.used[-3].type == "S"
-                            and stream.used[-4].is_delim(",")
+                            stream.pos >= 4
+                            and stream.tokens[stream.pos - 3].type == "S"
+                            and stream.tokens[stream.pos - 4].is_delim(",")
                         )
                     ):
                         raise SelectorSyntaxError(
@@ -727,7 +804,7 @@ def parse_simple_selector(
                 result = Function(result, ident, parse_arguments(stream))
         else:
             raise SelectorSyntaxError("Expected selector, got %s" % (peek,))
-    if len(stream.used) == selector_start:
+    if stream.pos == selector_start:
         raise SelectorSyntaxError("Expected selector, got %s" % (stream.peek(),))
     return result, pseudo_element
 
@@ -737,10 +814,7 @@ def parse_arguments(stream: "TokenStream") -> List["Token"]:
     while 1:
         stream.skip_whitespace()
         next = stream.next()
-        if next.type in ("IDENT", "STRING", "NUMBER") or next in [
-            ("DELIM", "+"),
-            ("DELIM", "-"),
-        ]:
+        if next.type in _argument_types or next in _argument_delims:
             arguments.append(next)
         elif next == ("DELIM", ")"):
             return arguments
@@ -753,7 +827,7 @@ def parse_relative_selector(stream: "TokenStream") -> Tuple["Token", Selector]:
     subselector = ""
     next = stream.next()
 
-    if next in [("DELIM", "+"), ("DELIM", "-"), ("DELIM", ">"), ("DELIM", "~")]:
+    if next in _relative_combinators:
         combinator = next
         stream.skip_whitespace()
         next = stream.next()
@@ -761,10 +835,7 @@ def parse_relative_selector(stream: "TokenStream") -> Tuple["Token", Selector]:
         combinator = Token("DELIM", " ", pos=0)
 
     while 1:
-        if next.type in ("IDENT", "STRING", "NUMBER") or next in [
-            ("DELIM", "."),
-            ("DELIM", "*"),
-        ]:
+        if next.type in _argument_types or next in _relative_delims:
             subselector += typing.cast(str, next.value)
         elif next == ("DELIM", ")"):
             result = parse(subselector)
@@ -784,7 +855,7 @@ def parse_simple_selector_arguments(stream: "TokenStream") -> List[Tree]:
             )
         stream.skip_whitespace()
         next = stream.next()
-        if next in (("EOF", None), ("DELIM", ",")):
+        if next in _selector_end:
             stream.next()
             stream.skip_whitespace()
             arguments.append(result)
@@ -822,9 +893,7 @@ def parse_attrib(selector: Tree, stream: "TokenStream") -> Attrib:
             return Attrib(selector, namespace, typing.cast(str, attrib), "exists", None)
         elif next == ("DELIM", "="):
             op = "="
-        elif next.is_delim("^", "$", "*", "~", "|", "!") and (
-            stream.peek() == ("DELIM", "=")
-        ):
+        elif next in _attrib_operator_delims and stream.peek() == ("DELIM", "="):
             op = typing.cast(str, next.value) + "="
             stream.next()
         else:
@@ -840,6 +909,10 @@ def parse_attrib(selector: Tree, stream: "TokenStream") -> Attrib:
     return Attrib(selector, namespace, typing.cast(str, attrib), op, value)
 
 
+# Series whose (a, b) values need no parsing
+_series_keywords = {"odd": (2, 1), "even": (2, 0), "n": (1, 0)}
+
+
 def parse_series(tokens: Iterable["Token"]) -> Tuple[int, int]:
     """
     Parses the arguments for :nth-child() and friends.
@@ -848,16 +921,15 @@ def parse_series(tokens: Iterable["Token"]) -> Tuple[int, int]:
     :returns: :``(a, b)``
 
     """
-    for token in tokens:
-        if token.type == "STRING":
+    values = []
+    for type_, value in tokens:
+        if type_ == "STRING":
             raise ValueError("String tokens not allowed in series.")
-    s = "".join(typing.cast(str, token.value) for token in tokens).strip()
-    if s == "odd":
-        return 2, 1
-    elif s == "even":
-        return 2, 0
-    elif s == "n":
-        return 1, 0
+        values.append(value)
+    s = "".join(typing.cast(List[str], values)).strip()
+    series = _series_keywords.get(s)
+    if series is not None:
+        return series
     if "n" not in s:
         # Just b
         return 0, int(s)
@@ -940,145 +1012,119 @@ class TokenMacros:
     nonascii = r"[^\0-\177]"
     nmchar = "[_a-z0-9-]|%s|%s" % (escape, nonascii)
     nmstart = "[_a-z]|%s|%s" % (escape, nonascii)
-
-
-if typing.TYPE_CHECKING:
-
-    class MatchFunc(typing.Protocol):
-        def __call__(
-            self, string: str, pos: int = ..., endpos: int = ...
-        ) -> Optional["re.Match[str]"]: ...
-
-
-def _compile(pattern: str) -> "MatchFunc":
-    return re.compile(pattern % vars(TokenMacros), re.IGNORECASE).match
-
-
-_match_whitespace = _compile(r"[ \t\r\n\f]+")
-_match_number = _compile(r"[+-]?(?:[0-9]*\.[0-9]+|[0-9]+)")
-_match_hash = _compile("#(?:%(nmchar)s)+")
-_match_ident = _compile("-?(?:%(nmstart)s)(?:%(nmchar)s)*")
-_match_string_by_quote = {
-    "'": _compile(r"([^\n\r\f\\']|%(string_escape)s)*"),
-    '"': _compile(r'([^\n\r\f\\"]|%(string_escape)s)*'),
-}
-
-_sub_simple_escape = re.compile(r"\\(.)").sub
-_sub_unicode_escape = re.compile(TokenMacros.unicode_escape, re.I).sub
-_sub_newline_escape = re.compile(r"\\(?:\n|\r\n|\r|\f)").sub
-
-# Same as r'\1', but faster on CPython
-_replace_simple = operator.methodcaller("group", 1)
-
-
-def _replace_unicode(match: "re.Match[str]") -> str:
-    codepoint = int(match.group(1), 16)
+    # Same as nmchar, with unescaped characters matched in runs
+    # by a single character class.
+    nmchars = r"[_a-z0-9\x80-\U0010ffff-]+|%s" % escape
+
+
+# One alternative per token type, tried in this order at each position.
+# Comments are matched but never yielded. The last alternative matches
+# any single character, so every position of the input is covered.
+_finditer_tokens = re.compile(
+    "|".join(
+        [
+            r"(?P<S>[ \t\r\n\f]+)",
+            r"(?P<IDENT>-?(?:%(nmstart)s)(?:%(nmchars)s)*)",
+            r"#(?P<HASH>(?:%(nmchars)s)+)",
+            r"(?P<STRING>'(?:[^\n\r\f\\']|%(string_escape)s)*(?P<sq_end>')?"
+            r'|"(?:[^\n\r\f\\"]|%(string_escape)s)*(?P<dq_end>")?)',
+            r"(?P<NUMBER>[+-]?(?:[0-9]*\.[0-9]+|[0-9]+))",
+            r"(?P<COMMENT>/\*.*?(?:\*/|\Z))",
+            r"(?P<DELIM>.)",
+        ]
+    )
+    % vars(TokenMacros),
+    re.IGNORECASE | re.DOTALL,
+).finditer
+
+# An escaped newline (only valid in strings, group 1), a unicode escape
+# (group 2) or any other escaped character (group 3)
+_sub_escape = re.compile(
+    r"\\(?:(\n|\r\n|\r|\f)|([0-9a-f]{1,6})(?:\r\n|[ \n\r\t\f])?|(.))",
+    re.IGNORECASE,
+).sub
+
+
+def _replace_escape(match: "re.Match[str]") -> str:
+    newline, hex_codepoint, char = match.groups()
+    if newline is not None:
+        return ""
+    if hex_codepoint is None:
+        return typing.cast(str, char)
+    codepoint = int(hex_codepoint, 16)
     if codepoint > sys.maxunicode:
         codepoint = 0xFFFD
     return chr(codepoint)
 
 
 def unescape_ident(value: str) -> str:
-    value = _sub_unicode_escape(_replace_unicode, value)
-    value = _sub_simple_escape(_replace_simple, value)
-    return value
+    if "\\" not in value:
+        return value
+    return _sub_escape(_replace_escape, value)
 
 
 def tokenize(s: str) -> Iterator[Token]:
-    pos = 0
     len_s = len(s)
-    while pos < len_s:
-        match = _match_whitespace(s, pos=pos)
-        if match:
-            yield Token("S", " ", pos)
-            pos = match.end()
-            continue
-
-        match = _match_ident(s, pos=pos)
-        if match:
-            value = _sub_simple_escape(
-                _replace_simple, _sub_unicode_escape(_replace_unicode, match.group())
-            )
-            yield Token("IDENT", value, pos)
-            pos = match.end()
-            continue
-
-        match = _match_hash(s, pos=pos)
-        if match:
-            value = _sub_simple_escape(
-                _replace_simple,
-                _sub_unicode_escape(_replace_unicode, match.group()[1:]),
-            )
-            yield Token("HASH", value, pos)
-            pos = match.end()
-            continue
-
-        quote = s[pos]
-        if quote in _match_string_by_quote:
-            match = _match_string_by_quote[quote](s, pos=pos + 1)
-            assert match, "Should have found at least an empty match"
-            end_pos = match.end()
-            if end_pos == len_s:
-                raise SelectorSyntaxError("Unclosed string at %s" % pos)
-            if s[end_pos] != quote:
+    # Local names are faster to look up than globals in the loop below.
+    Token_ = Token
+    unescape = unescape_ident
+    for match in _finditer_tokens(s):
+        type_ = match.lastgroup
+        pos = match.start()
+        # Branches are ordered by how often each token type occurs.
+        if type_ == "DELIM":
+            yield Token_("DELIM", match.group(), pos)
+        elif type_ == "S":
+            yield Token_("S", " ", pos)
+        elif type_ == "IDENT":
+            yield Token_("IDENT", unescape(match.group()), pos)
+        elif type_ == "HASH":
+            yield Token_("HASH", unescape(match.group("HASH")), pos)
+        elif type_ == "STRING":
+            if match.group("sq_end") is None and match.group("dq_end") is None:
+                if match.end() == len_s:
+                    raise SelectorSyntaxError("Unclosed string at %s" % pos)
                 raise SelectorSyntaxError("Invalid string at %s" % pos)
-            value = _sub_simple_escape(
-                _replace_simple,
-                _sub_unicode_escape(
-                    _replace_unicode, _sub_newline_escape("", match.group())
-                ),
-            )
-            yield Token("STRING", value, pos)
-            pos = end_pos + 1
-            continue
-
-        match = _match_number(s, pos=pos)
-        if match:
-            value = match.group()
-            yield Token("NUMBER", value, pos)
-            pos = match.end()
-            continue
-
-        pos2 = pos + 2
-        if s[pos:pos2] == "/*":
-            pos = s.find("*/", pos2)
-            if pos == -1:
-                pos = len_s
-            else:
-                pos += 2
-            continue
-
-        yield Token("DELIM", s[pos], pos)
-        pos += 1
+            yield Token_("STRING", unescape(match.group()[1:-1]), pos)
+        elif type_ == "NUMBER":
+            yield Token_("NUMBER", match.group(), pos)
+        # Comments are skipped
 
-    assert pos == len_s
-    yield EOFToken(pos)
+    yield EOFToken(len_s)
 
 
 class TokenStream:
+    """A list of tokens with a cursor.
+
+    Once the last token (normally EOF) is reached, :meth:`next` and
+    :meth:`peek` keep returning it.
+
+    """
+
+    __slots__ = ("tokens", "pos", "last_pos", "source")
+
     def __init__(self, tokens: Iterable[Token], source: Optional[str] = None) -> None:
-        self.used: List[Token] = []
-        self.tokens = iter(tokens)
+        self.tokens: List[Token] = list(tokens)
+        self.pos = 0
+        self.last_pos = len(self.tokens) - 1
         self.source = source
-        self.peeked: Optional[Token] = None
-        self._peeking = False
-        self.next_token = self.tokens.__next__
+
+    @property
+    def used(self) -> List[Token]:
+        return self.tokens[: self.pos]
 
     def next(self) -> Token:
-        if self._peeking:
-            self._peeking = False
-            self.used.append(typing.cast(Token, self.peeked))
-            return typing.cast(Token, self.peeked)
-        else:
-            next = self.next_token()
-            self.used.append(next)
-            return next
+        pos = self.pos
+        if pos > self.last_pos:
+            return self.tokens[-1]
+        self.pos = pos + 1
+        return self.tokens[pos]
 
     def peek(self) -> Token:
-        if not self._peeking:
-            self.peeked = self.next_token()
-            self._peeking = True
-        return typing.cast(Token, self.peeked)
+        pos = self.pos
+        if pos > self.last_pos:
+            return self.tokens[-1]
+        return self.tokens[pos]
 
     def next_ident(self) -> str:
         next = self.next()
@@ -1096,6 +1142,20 @@ class TokenStream:
             raise SelectorSyntaxError("Expected ident or '*', got %s" % (next,))
 
     def skip_whitespace(self) -> None:
-        peek = self.peek()
-        if peek.type == "S":
-            self.next()
+        pos = self.pos
+        if pos <= self.last_pos and self.tokens[pos].type == "S":
+            self.pos = pos + 1
+
+    def skip_whitespace_and_peek(self) -> Token:
+        """Same as :meth:`skip_whitespace` followed by :meth:`peek`."""
+        pos = self.pos
+        if pos > self.last_pos:
+            return self.tokens[-1]
+        token = self.tokens[pos]
+        if token.type == "S":
+            pos += 1
+            self.pos = pos
+            if pos > self.last_pos:
+                return self.tokens[-1]
+            token = self.tokens[pos]
+        return token
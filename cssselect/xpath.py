@@ -13,9 +13,12 @@
 """
 
 import re
+import threading
 import typing
 import warnings
-from typing import Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 from cssselect.parser import (
     Attrib,
@@ -57,6 +60,8 @@ class ExpressionError(SelectorError, RuntimeError):
 
 
 class XPathExpr:
+    __slots__ = ("path", "element", "condition")
+
     def __init__(
         self,
         path: str = "",
@@ -69,10 +74,9 @@ class XPathExpr:
         self.condition = condition
 
     def __str__(self) -> str:
-        path = str(self.path) + str(self.element)
         if self.condition:
-            path += "[%s]" % self.condition
-        return path
+            return "%s%s[%s]" % (self.path, self.element, self.condition)
+        return "%s%s" % (self.path, self.element)
 
     def __repr__(self) -> str:
         return "%s[%s]" % (self.__class__.__name__, self)
@@ -136,6 +140,45 @@ is_safe_name = re.compile("^[a-zA-Z_][a-zA-Z0-9_.-]*$").match
 # Test that the string is not empty and does not contain whitespace
 is_non_whitespace = re.compile(r"^[^ \t\r\n\f]+$").match
 
+# Names of the xpath_* methods that GenericTranslator.xpath() dispatches to,
+# by parsed object type. Only the names are cached: methods are still looked
+# up on the translator, so subclasses can override or add them.
+_xpath_method_names: Dict[type, str] = {}
+
+
+@lru_cache(maxsize=256)
+def _method_name(name: str, kind: str) -> str:
+    """Name of the method translating the pseudo-class or function *name*."""
+    return "xpath_%s_%s" % (name.replace("-", "_"), kind)
+
+
+@lru_cache(maxsize=1024)
+def _xpath_literal(s: str) -> str:
+    """Quote *s* as an XPath string literal."""
+    # Plain concatenation is cheaper than %-formatting for the common
+    # cases, which need no concat().
+    if "'" not in s:
+        return "'" + s + "'"
+    if '"' not in s:
+        return '"' + s + '"'
+    return "concat(%s)" % ",".join(
+        [
+            (("'" in part) and '"%s"' or "'%s'") % part
+            for part in split_at_single_quotes(s)
+            if part
+        ]
+    )
+
+
+# Maximum number of css_to_xpath() results cached per translator
+_css_to_xpath_cache_size = 256
+# Translators may be shared between threads.
+_css_to_xpath_lock = threading.Lock()
+
+# Tokens compare and hash by type and value only, which is all
+# parse_series() looks at, so they make a valid cache key.
+_parse_series = lru_cache(maxsize=64)(parse_series)
+
 
 #### Translation
 
@@ -208,6 +251,15 @@ class GenericTranslator:
     # class used to represent and xpath expression
     xpathexpr_cls = XPathExpr
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # Any attribute can change how selectors are translated.
+        self.__dict__.pop("_css_to_xpath_cache", None)
+
+    def __delattr__(self, name: str) -> None:
+        super().__delattr__(name)
+        self.__dict__.pop("_css_to_xpath_cache", None)
+
     def css_to_xpath(self, css: str, prefix: str = "descendant-or-self::") -> str:
         """Translate a *group of selectors* to XPath.
 
@@ -226,11 +278,32 @@ class GenericTranslator:
         :returns:
             The equivalent XPath 1.0 expression as a string.
 
+        Results are cached per translator instance, and the cache is
+        dropped whenever an attribute of the instance is set or deleted.
+        Changes made to the translator class are not seen by instances
+        that have already translated the same selector.
+
         """
-        return " | ".join(
+        cache: Optional["OrderedDict[Tuple[str, str], str]"]
+        cache = self.__dict__.get("_css_to_xpath_cache")
+        if cache is None:
+            cache = self.__dict__.setdefault("_css_to_xpath_cache", OrderedDict())
+        key = (css, prefix)
+        with _css_to_xpath_lock:
+            xpath = cache.get(key)
+            if xpath is not None:
+                cache.move_to_end(key)
+                return xpath
+        xpath = " | ".join(
             self.selector_to_xpath(selector, prefix, translate_pseudo_elements=True)
             for selector in parse(css)
         )
+        with _css_to_xpath_lock:
+            cache[key] = xpath
+            if len(cache) > _css_to_xpath_cache_size:
+                # Evict the least recently used entry.
+                cache.popitem(last=False)
+        return xpath
 
     def selector_to_xpath(
         self,
@@ -280,27 +353,20 @@ class GenericTranslator:
 
     @staticmethod
     def xpath_literal(s: str) -> str:
-        s = str(s)
-        if "'" not in s:
-            s = "'%s'" % s
-        elif '"' not in s:
-            s = '"%s"' % s
-        else:
-            s = "concat(%s)" % ",".join(
-                [
-                    (("'" in part) and '"%s"' or "'%s'") % part
-                    for part in split_at_single_quotes(s)
-                    if part
-                ]
-            )
-        return s
+        # Callers may pass non-str values: format them before they
+        # become cache keys, so that values comparing equal do not collide.
+        return _xpath_literal(str(s))
 
     def xpath(self, parsed_selector: Tree) -> XPathExpr:
         """Translate any parsed selector object."""
-        type_name = type(parsed_selector).__name__
-        method = getattr(self, "xpath_%s" % type_name.lower(), None)
+        type_ = type(parsed_selector)
+        method_name = _xpath_method_names.get(type_)
+        if method_name is None:
+            method_name = "xpath_%s" % type_.__name__.lower()
+            _xpath_method_names[type_] = method_name
+        method = getattr(self, method_name, None)
         if method is None:
-            raise ExpressionError("%s is not supported." % type_name)
+            raise ExpressionError("%s is not supported." % type_.__name__)
         return typing.cast(XPathExpr, method(parsed_selector))
 
     # Dispatched by parsed object type
@@ -355,16 +421,14 @@ class GenericTranslator:
 
     def xpath_function(self, function: Function) -> XPathExpr:
         """Translate a functional pseudo-class."""
-        method_name = "xpath_%s_function" % function.name.replace("-", "_")
-        method = getattr(self, method_name, None)
+        method = getattr(self, _method_name(function.name, "function"), None)
         if not method:
             raise ExpressionError("The pseudo-class :%s() is unknown" % function.name)
         return typing.cast(XPathExpr, method(self.xpath(function.selector), function))
 
     def xpath_pseudo(self, pseudo: Pseudo) -> XPathExpr:
         """Translate a pseudo-class."""
-        method_name = "xpath_%s_pseudo" % pseudo.ident.replace("-", "_")
-        method = getattr(self, method_name, None)
+        method = getattr(self, _method_name(pseudo.ident, "pseudo"), None)
         if not method:
             # TODO: better error message for pseudo-elements?
             raise ExpressionError("The pseudo-class :%s is unknown" % pseudo.ident)
@@ -494,7 +558,7 @@ class GenericTranslator:
         add_name_test: bool = True,
     ) -> XPathExpr:
         try:
-            a, b = parse_series(function.arguments)
+            a, b = _parse_series(tuple(function.arguments))
         except ValueError:
             raise ExpressionError("Invalid series: '%r'" % function.arguments)
 
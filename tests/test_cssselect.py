@@ -17,9 +17,12 @@
 
 """
 
+import gc
 import sys
 import typing
 import unittest
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Sequence, Tuple
 
 from lxml import etree, html
@@ -39,7 +42,7 @@ from cssselect.parser import (
     parse_series,
     tokenize,
 )
-from cssselect.xpath import XPathExpr
+from cssselect.xpath import XPathExpr, _css_to_xpath_cache_size
 
 
 class TestCssselect(unittest.TestCase):
@@ -184,6 +187,16 @@ class TestCssselect(unittest.TestCase):
             "Hash[Element[*]#foo]] <followed> Hash[Element[*]#bar]]"
         ]
 
+    def test_parse_cache(self) -> None:
+        selectors = parse("div > p.a, a[href]")
+        selectors.pop()
+        cached = parse("div > p.a, a[href]")
+        assert len(cached) == 2
+        assert cached is not selectors
+        assert cached[0] is selectors[0]
+        for _ in range(2):
+            self.assertRaises(SelectorSyntaxError, parse, "div >")
+
     def test_pseudo_elements(self) -> None:
         def parse_pseudo(css: str) -> List[Tuple[str, Optional[str]]]:
             result: List[Tuple[str, Optional[str]]] = []
@@ -439,6 +452,12 @@ class TestCssselect(unittest.TestCase):
         # Unsupported :has() with several arguments
         assert get_error(":has(a, b)") == ("Expected an argument, got <DELIM ',' at 6>")
         assert get_error(":has()") == ("Expected selector, got <EOF at 0>")
+        assert get_error(":is(a") == ("Expected selector, got <EOF at 5>")
+        assert get_error(":where(a, b") == ("Expected selector, got <EOF at 11>")
+        # The whole input is tokenized before parsing, so tokenizer errors
+        # are reported before syntax errors that occur earlier in the input.
+        assert get_error("! 'x") == "Unclosed string at 2"
+        assert get_error("!/*:contains(>\\5c */:b+\n,'") == "Unclosed string at 25"
 
     def test_translation(self) -> None:
         def xpath(css: str) -> str:
@@ -581,6 +600,60 @@ class TestCssselect(unittest.TestCase):
         self.assertRaises(TypeError, GenericTranslator().css_to_xpath, 4)
         self.assertRaises(TypeError, GenericTranslator().selector_to_xpath, "foo")
 
+    def test_translation_cache(self) -> None:
+        generic = GenericTranslator()
+        html_translator = HTMLTranslator()
+        assert generic.css_to_xpath("DIV.a") == generic.css_to_xpath("DIV.a")
+        assert generic.css_to_xpath("DIV.a") == (
+            "descendant-or-self::DIV[@class and contains("
+            "concat(' ', normalize-space(@class), ' '), ' a ')]"
+        )
+        # Translators do not share cached results.
+        assert html_translator.css_to_xpath("DIV.a") == (
+            "descendant-or-self::div[@class and contains("
+            "concat(' ', normalize-space(@class), ' '), ' a ')]"
+        )
+        assert generic.css_to_xpath("DIV.a", prefix="") == (
+            "DIV[@class and contains("
+            "concat(' ', normalize-space(@class), ' '), ' a ')]"
+        )
+        # Changing an attribute of the translator drops its cached results.
+        assert generic.css_to_xpath("DIV") == "descendant-or-self::DIV"
+        generic.lower_case_element_names = True
+        assert generic.css_to_xpath("DIV") == "descendant-or-self::div"
+        del generic.lower_case_element_names
+        assert generic.css_to_xpath("DIV") == "descendant-or-self::DIV"
+        # Caching does not keep translators alive.
+        ref = weakref.ref(generic)
+        del generic
+        gc.collect()
+        assert ref() is None
+
+    def test_translation_cache_size(self) -> None:
+        translator = GenericTranslator()
+        cache_size = _css_to_xpath_cache_size
+        for i in range(cache_size):
+            translator.css_to_xpath("a%d" % i)
+        # A hit makes an entry the most recently used one.
+        assert translator.css_to_xpath("a0") == "descendant-or-self::a0"
+        translator.css_to_xpath("b")
+        cache = translator.__dict__["_css_to_xpath_cache"]
+        assert len(cache) == cache_size
+        assert ("a0", "descendant-or-self::") in cache
+        assert ("a1", "descendant-or-self::") not in cache
+
+        # Translators can be shared between threads.
+        def translate(start: int) -> None:
+            for i in range(start, start + 2 * cache_size):
+                assert translator.css_to_xpath("c%d" % i) == (
+                    "descendant-or-self::c%d" % i
+                )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [executor.submit(translate, i * 8) for i in range(8)]:
+                future.result()
+        assert len(cache) == cache_size
+
     def test_unicode(self) -> None:
         css = ".a\xc1b"
         xpath = GenericTranslator().css_to_xpath(css)
@@ -608,6 +681,12 @@ class TestCssselect(unittest.TestCase):
         assert css_to_xpath(':scope > div[dataimg="<testmessage>"]') == (
             "descendant-or-self::*[1]/div[@dataimg = '<testmessage>']"
         )
+        # Non-str values are formatted with str(), even those that compare
+        # equal to values quoted before or that are unhashable.
+        xpath_literal = GenericTranslator.xpath_literal
+        assert xpath_literal(typing.cast(str, True)) == "'True'"
+        assert xpath_literal(typing.cast(str, 1.0)) == "'1.0'"
+        assert xpath_literal(typing.cast(str, ["a"])) == "\"['a']\""
 
     def test_unicode_escapes(self) -> None:
         # \22 == '"'  \20 == ' '
@@ -624,6 +703,13 @@ class TestCssselect(unittest.TestCase):
         assert css_to_xpath("*[aval=\"'\\20\r\n '\"]") == (
             """descendant-or-self::*[@aval = "'  '"]"""
         )
+        # Escapes are only decoded once: \5c is an escaped backslash.
+        assert css_to_xpath(r"*[aval='\5c 41']") == (
+            r"descendant-or-self::*[@aval = '\41']"
+        )
+        assert css_to_xpath(r"*[aval='\\41']") == (
+            r"descendant-or-self::*[@aval = '\41']"
+        )
 
     def test_xpath_pseudo_elements(self) -> None:
         class CustomTranslator(GenericTranslator):